@@ -0,0 +1,174 @@
+import array
+import os
+import queue
+import sys
+import threading
+import time
+
+from problems import MINUS, MULTIPLY, DIVIDE, Problem
+
+
+OPERATORS = ('+', MINUS, MULTIPLY, DIVIDE)  # der Index ist der gespeicherte Operator-Code
+
+# die Spalten des Speichers und ihre Typcodes (siehe Modul array); jede Spalte liegt in einer eigenen Datei
+COLUMNS = {
+    'timestamp': 'q',  # Unix-Zeit der Antwort
+    'operator': 'B',  # Index in OPERATORS
+    'operand_1': 'h',
+    'operand_2': 'h',
+    'solution': 'h',
+    'option_pattern': 'B',  # siehe problems.__random_options()
+    'answer': 'h',  # die gewählte Option
+    'answer_index': 'B',  # die Position der gewählten Option (0 bis 2)
+    'reaction_time': 'f'  # in Sekunden
+}
+
+OPERAND_RANGE_LIMITS = (10, 20, 30, 40, 50, 100)  # obere Grenzen der Bereiche für den größeren Operanden (Dividenden bis 100)
+PERCENTILES = (50, 90, 99)
+
+
+# Sammelt Antworten spaltenweise im Speicher. flush() übergibt die gesammelten Spalten einem eigenen Thread, der sie an die
+# Spaltendateien anhängt, damit der Spielloop nicht auf die Festplatte warten muss.
+class AnalyticsStore:
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.columns = AnalyticsStore.empty_columns()
+        self.queue: queue.SimpleQueue[dict[str, array.array] | None] = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.write_loop, name='analytics-writer', daemon=True)
+        self.thread.start()
+
+
+    def add_answer(self, problem: Problem, answer: int, reaction_time: float) -> None:
+        values = {
+            'timestamp': int(time.time()),
+            'operator': OPERATORS.index(problem.operator),
+            'operand_1': problem.operands[0],
+            'operand_2': problem.operands[1],
+            'solution': problem.solution,
+            'option_pattern': problem.option_pattern,
+            'answer': answer,
+            'answer_index': problem.options.index(answer),
+            'reaction_time': reaction_time
+        }
+        for (name, value) in values.items():
+            self.columns[name].append(value)
+
+
+    def flush(self) -> None:
+        if not self.columns['timestamp']:
+            return
+        self.queue.put(self.columns)
+        self.columns = AnalyticsStore.empty_columns()
+
+
+    def close(self) -> None:
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+
+
+    def write_loop(self) -> None:
+        truncate_columns(self.directory)
+        while (columns := self.queue.get()) is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            for (name, column) in columns.items():
+                with open(column_path(self.directory, name), 'ab') as file:
+                    column.tofile(file)
+
+
+    @staticmethod
+    def empty_columns() -> dict[str, array.array]:
+        return {name: array.array(typecode) for (name, typecode) in COLUMNS.items()}
+
+
+def column_path(directory: str, name: str) -> str:
+    return os.path.join(directory, f'{name}.bin')
+
+
+def truncate_columns(directory: str) -> None:
+    # Wurde das Spiel mitten in einem flush() beendet, sind einzelne Spalten länger als die anderen. Vor dem nächsten
+    # Anhängen werden alle auf die gemeinsame Zeilenzahl gekürzt, sonst wären alle folgenden Zeilen gegeneinander verschoben.
+    item_sizes = {name: array.array(typecode).itemsize for (name, typecode) in COLUMNS.items()}
+    sizes = {}
+    for name in COLUMNS:
+        try:
+            sizes[name] = os.path.getsize(column_path(directory, name))
+        except FileNotFoundError:
+            sizes[name] = 0
+    n_rows = min(sizes[name] // item_sizes[name] for name in COLUMNS)
+    for name in COLUMNS:
+        if sizes[name] > n_rows * item_sizes[name]:  # auch ein halb geschriebener Wert wird abgeschnitten
+            os.truncate(column_path(directory, name), n_rows * item_sizes[name])
+
+
+# Auswertung (benötigt NumPy):
+
+def load_columns(directory: str) -> dict:
+    import numpy as np
+    columns = {name: np.fromfile(column_path(directory, name), dtype=np.dtype(typecode))
+               for (name, typecode) in COLUMNS.items()}
+    # falls das Spiel beim Anhängen beendet wurde, sind einzelne Spalten länger als die anderen:
+    n_rows = min(len(c) for c in columns.values())
+    return {name: c[:n_rows] for (name, c) in columns.items()}
+
+
+def local_hours(timestamps):
+    # jede Zeit mit ihrer eigenen Abweichung von UTC umrechnen (sonst liegen die Stunden über die Sommerzeit hinweg falsch);
+    # die Abweichung wechselt nur zu vollen Stunden, deshalb wird sie je UTC-Stunde nur einmal bestimmt
+    import numpy as np
+    (utc_hours, inverse) = np.unique(timestamps // 3600, return_inverse=True)
+    offsets = np.array([time.localtime(h * 3600).tm_gmtoff for h in utc_hours.tolist()], dtype=np.int64)
+    return (timestamps + offsets[inverse]) // 3600 % 24
+
+
+def report(directory: str) -> str:
+    import numpy as np
+    try:
+        columns = load_columns(directory)
+    except FileNotFoundError:
+        return 'no data\n'  # noch kein Durchlauf gespielt
+    if len(columns['timestamp']) == 0:
+        return 'no data\n'
+    reaction_times = columns['reaction_time']
+    operators = columns['operator']
+    correct = columns['answer'] == columns['solution']
+    larger_operand = np.maximum(columns['operand_1'], columns['operand_2'])
+    operand_ranges = np.searchsorted(OPERAND_RANGE_LIMITS, larger_operand)
+    hours = local_hours(columns['timestamp'])
+
+    lines = [f'{len(reaction_times)} answers, {np.count_nonzero(correct) / max(1, len(correct)):.1%} correct', '']
+    percentile_header = '  '.join(f'p{p:<5}' for p in PERCENTILES)
+
+    def add_percentile_table(title: str, keys: np.ndarray, label) -> None:
+        lines.append(f'{title:<16}{"n":>9}  {"correct":>7}  {percentile_header}')
+        (unique_keys, inverse) = np.unique(keys, return_inverse=True)
+        for (i, key) in enumerate(unique_keys):
+            selected = inverse == i
+            percentiles = np.percentile(reaction_times[selected], PERCENTILES)
+            lines.append(f'{label(key):<16}{np.count_nonzero(selected):>9}  {correct[selected].mean():>7.1%}  ' +
+                         '  '.join(f'{p:<6.2f}' for p in percentiles))
+        lines.append('')
+
+    add_percentile_table('operator', operators, lambda key: OPERATORS[key])
+    add_percentile_table('operand range', operand_ranges,
+                         lambda key: f'{(OPERAND_RANGE_LIMITS[key - 1] + 1) if key > 0 else 0}–{OPERAND_RANGE_LIMITS[key]}')
+    add_percentile_table('hour of day', hours, lambda key: f'{key:02d}:00')
+
+    # welche Ablenker bei falschen Antworten gewählt werden:
+    lines.append(f'{"operator/pattern":<16}{"n":>9}  {"wrong":>7}  {"lower":>7}  {"higher":>7}')
+    below = columns['answer'] < columns['solution']
+    groups = operators.astype(np.int64) * 4 + columns['option_pattern']
+    (unique_groups, inverse) = np.unique(groups, return_inverse=True)
+    for (i, group) in enumerate(unique_groups):
+        selected = inverse == i
+        wrong = selected & ~correct
+        n_wrong = max(1, np.count_nonzero(wrong))
+        lines.append(f'{OPERATORS[group // 4] + " / " + str(group % 4):<16}{np.count_nonzero(selected):>9}  '
+                     f'{np.count_nonzero(wrong) / np.count_nonzero(selected):>7.1%}  '
+                     f'{np.count_nonzero(wrong & below) / n_wrong:>7.1%}  {np.count_nonzero(wrong & ~below) / n_wrong:>7.1%}')
+    return '\n'.join(lines) + '\n'
+
+
+if __name__ == '__main__':
+    print(report(sys.argv[1] if len(sys.argv) > 1 else 'analytics'), end='')
@@ -0,0 +1,59 @@
+import os
+import sys
+import threading
+
+from typing import Callable
+
+
+# Speichert Schnappschüsse in einem eigenen Thread. Der Spielloop übergibt nur einen unveränderlichen Schnappschuss;
+# umgewandelt und geschrieben wird im Hintergrund. Kommen mehrere Schnappschüsse, bevor der vorige geschrieben ist,
+# wird nur der neueste gespeichert.
+class Autosaver:
+
+    def __init__(self, path: str, serialize: Callable[[object], str]) -> None:
+        self.path = path
+        self.serialize = serialize
+        self.lock = threading.Lock()
+        self.snapshot: object | None = None  # der neueste noch nicht gespeicherte Schnappschuss
+        self.wake_event = threading.Event()
+        self.closing = False
+        self.thread = threading.Thread(target=self.save_loop, name='autosaver', daemon=True)
+        self.thread.start()
+
+
+    def request(self, snapshot: object) -> None:
+        with self.lock:
+            self.snapshot = snapshot
+        self.wake_event.set()
+
+
+    def close(self) -> None:
+        # wartet, bis der letzte Schnappschuss geschrieben ist
+        self.closing = True
+        self.wake_event.set()
+        self.thread.join()
+
+
+    def save_loop(self) -> None:
+        while True:
+            self.wake_event.wait()
+            self.wake_event.clear()
+            with self.lock:
+                (snapshot, self.snapshot) = (self.snapshot, None)
+            if snapshot is not None:
+                try:
+                    write_file_atomically(self.path, self.serialize(snapshot))
+                except OSError as e:
+                    print(f'could not save {self.path}: {e}', file=sys.stderr)
+            if self.closing and self.snapshot is None:
+                return
+
+
+def write_file_atomically(path: str, data: str) -> None:
+    # erst in eine temporäre Datei schreiben und diese dann umbenennen, damit nie eine halb geschriebene Datei entsteht
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='UTF-8') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
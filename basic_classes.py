@@ -1,4 +1,6 @@
-from dataclasses import dataclass
+from __future__ import annotations
+
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import Callable
 
@@ -35,6 +37,9 @@ class Score:
     time: float
     timestamp: int
     player_name: str
+    reaction_times: list[float] = field(default_factory=list)  # die Reaktionszeit pro Problem in Sekunden
+    operators: list[str] = field(default_factory=list)  # der Operator pro Problem
+    display_name: str = field(default='–', compare=False)  # der angezeigte Name (wird nicht gespeichert)
     
     
     def to_dict(self) -> None:
@@ -43,10 +48,18 @@ class Score:
             'nCorrect': self.n_correct,
             'time': self.time,
             'timestamp': self.timestamp,
-            'playerName': self.player_name
+            'playerName': self.player_name,
+            'reactionTimes': self.reaction_times,
+            'operators': self.operators
         }
 
 
+    @staticmethod
+    def from_dict(d: dict) -> Score:
+        return Score(d['score'], d['nCorrect'], d['time'], d['timestamp'], d['playerName'], d.get('reactionTimes', []),
+                     d.get('operators', []))
+
+
 @dataclass
 class ButtonData:
     
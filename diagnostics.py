@@ -0,0 +1,154 @@
+import bisect
+import gc
+import logging
+import logging.handlers
+import time
+import tracemalloc
+
+
+# Histogramm der Zeit von einem Eingabe-Event bis zu dem Bild, in dem die zugehörige Änderung angezeigt wird
+class LatencyHistogram:
+
+    BUCKET_LIMITS_MS = (2, 4, 6, 8, 10, 12, 14, 16, 20, 25, 30, 40, 50, 75, 100, 150, 200)
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LatencyHistogram.BUCKET_LIMITS_MS) + 1)  # der letzte Eimer zählt alles darüber
+        self.samples: list[float] = []
+        self.pending_input_time: float | None = None
+
+
+    def start(self, input_time: float) -> None:
+        # input_time: wann das Event eingetroffen ist (perf_counter-Zeit), damit die Wartezeit in der Warteschlange mitzählt;
+        # nur die erste Änderung seit dem letzten Bild zählt
+        if self.pending_input_time is None:
+            self.pending_input_time = input_time
+
+
+    def stop(self) -> None:
+        # wird direkt nach pygame.display.flip() aufgerufen
+        if self.pending_input_time is None:
+            return
+        latency_ms = (time.perf_counter() - self.pending_input_time) * 1000
+        self.pending_input_time = None
+        self.counts[bisect.bisect_left(LatencyHistogram.BUCKET_LIMITS_MS, latency_ms)] += 1
+        self.samples.append(latency_ms)
+
+
+    def percentile(self, p: float) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+    def dump(self, path: str) -> None:
+        with open(path, 'w', encoding='UTF-8') as file:
+            file.write(self.format())
+
+
+    def format(self) -> str:
+        if not self.samples:
+            return 'no samples\n'
+        lines = ['n = %d, min = %.2f ms, p50 = %.2f ms, p95 = %.2f ms, p99 = %.2f ms, max = %.2f ms' %
+                 (len(self.samples), min(self.samples), self.percentile(50), self.percentile(95), self.percentile(99),
+                  max(self.samples))]
+        lower = 0
+        width = max(self.counts)
+        for (limit, count) in zip(LatencyHistogram.BUCKET_LIMITS_MS + (None,), self.counts):
+            label = '%4d–%-4d ms' % (lower, limit) if limit is not None else '%4d+      ms' % lower
+            lines.append('%s | %-40s %d' % (label, '#' * round(40 * count / width), count))
+            if limit is not None:
+                lower = limit
+        return '\n'.join(lines) + '\n'
+
+
+# Misst im Dauerbetrieb, wie viel Speicher pro Bild angelegt wird (getrennt nach Bildschirm), und schreibt in Abständen
+# einen Bericht mit den GC-Statistiken in ein rotierendes Log. Wächst der Speicher über mehrere Berichte hinweg stetig,
+# wird eine Warnung mit den Codezeilen geschrieben, deren Speicher am stärksten gewachsen ist.
+class MemoryProfiler:
+
+    SAMPLE_INTERVAL = 60.0  # Sekunden zwischen zwei Berichten
+    GROWTH_SAMPLES = 10  # so viele Berichte in Folge mit wachsendem Speicher gelten als stetiges Wachstum
+    GROWTH_THRESHOLD = 1024 * 1024  # ab so viel Wachstum (in Bytes) über diese Berichte wird gewarnt
+    LOG_MAX_BYTES = 1024 * 1024
+    LOG_BACKUP_COUNT = 5
+
+    def __init__(self, path: str) -> None:
+        self.logger = logging.getLogger('math_game.memory')
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=MemoryProfiler.LOG_MAX_BYTES,
+                                                       backupCount=MemoryProfiler.LOG_BACKUP_COUNT, encoding='UTF-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+        self.logger.addHandler(handler)
+        tracemalloc.start()
+        self.screen = ''
+        self.frame_start_memory = 0
+        self.screen_stats: dict[str, list[int]] = {}  # Bildschirm -> [Bilder, kurzlebig angelegte Bytes, verbliebene Bytes]
+        self.last_sample_time = time.perf_counter()
+        self.last_gc_stats = gc.get_stats()
+        self.memory_history: list[int] = []
+        self.baseline_snapshot: tracemalloc.Snapshot | None = None  # wird beim ersten Bericht genommen
+        self.logger.info('memory profiling started')
+
+
+    def begin_frame(self, screen: str) -> None:
+        self.screen = screen
+        tracemalloc.reset_peak()
+        self.frame_start_memory = tracemalloc.get_traced_memory()[0]
+
+
+    def end_frame(self) -> None:
+        (current, peak) = tracemalloc.get_traced_memory()
+        stats = self.screen_stats.setdefault(self.screen, [0, 0, 0])
+        stats[0] += 1
+        stats[1] += peak - self.frame_start_memory
+        stats[2] += current - self.frame_start_memory
+        if time.perf_counter() - self.last_sample_time >= MemoryProfiler.SAMPLE_INTERVAL:
+            self.sample()
+
+
+    def sample(self) -> None:
+        self.last_sample_time = time.perf_counter()
+        (current, _) = tracemalloc.get_traced_memory()
+        for (screen, (n_frames, transient, retained)) in sorted(self.screen_stats.items()):
+            self.logger.info('%-16s %7d frames, %9.1f B allocated per frame, %+8.1f B retained per frame', screen, n_frames,
+                             transient / n_frames, retained / n_frames)
+        self.screen_stats.clear()
+        gc_stats = gc.get_stats()
+        collections = [new['collections'] - old['collections'] for (old, new) in zip(self.last_gc_stats, gc_stats)]
+        self.last_gc_stats = gc_stats
+        self.logger.info('traced %d B, %d GC objects, collections per generation since last report: %s', current,
+                         len(gc.get_objects()), collections)
+        if self.baseline_snapshot is None:
+            # erst hier, nach dem Start des Spiels, damit Schriften, Menüs usw. nicht als Wachstum gemeldet werden
+            self.baseline_snapshot = self.take_snapshot()
+        self.check_growth(current)
+
+
+    def check_growth(self, current: int) -> None:
+        self.memory_history.append(current)
+        del self.memory_history[:-MemoryProfiler.GROWTH_SAMPLES]
+        history = self.memory_history
+        growing = all(a < b for (a, b) in zip(history, history[1:]))
+        if len(history) == MemoryProfiler.GROWTH_SAMPLES and growing and history[-1] - history[0] > MemoryProfiler.GROWTH_THRESHOLD:
+            snapshot = self.take_snapshot()
+            self.logger.warning('steady memory growth: %+d B over the last %d reports', history[-1] - history[0], len(history))
+            for stat in snapshot.compare_to(self.baseline_snapshot, 'lineno')[:10]:
+                self.logger.warning('  %s', stat)
+            self.baseline_snapshot = snapshot
+            self.memory_history.clear()
+
+
+    def take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, logging.__file__)
+        ))
+
+
+    def close(self) -> None:
+        self.sample()
+        self.logger.info('memory profiling stopped')
+        tracemalloc.stop()
+        for handler in list(self.logger.handlers):
+            handler.close()
+            self.logger.removeHandler(handler)
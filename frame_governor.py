@@ -0,0 +1,32 @@
+# Wählt für jedes Bild die Bildfrequenz: hoch, solange etwas in Bewegung ist (laufende Zeit, Feedback-Symbol, kurz nach
+# einer Eingabe), niedrig auf stehenden Menüs. Braucht das Rendern länger als das Budget eines Bildes, wird die Frequenz
+# gesenkt, bis es wieder passt.
+class FrameGovernor:
+
+    HIGH_FPS = 100  # während eines Durchlaufs und kurz nach Eingaben
+    LOW_FPS = 30  # auf stehenden Menüs
+    MIN_FPS = 20  # tiefer wird auch bei zu langsamem Rendern nicht gegangen
+    INPUT_BOOST_TIME = 0.5  # wie lange nach einer Eingabe mit hoher Frequenz gerendert wird (in Sekunden)
+    BUDGET_SHARE = 0.8  # welcher Anteil eines Bildes höchstens mit Rendern verbracht werden soll
+    SMOOTHING = 0.05  # Gewicht der neuesten Messung im gleitenden Mittelwert der Renderzeit
+
+    def __init__(self) -> None:
+        self.work_time = 0.0  # gleitender Mittelwert der Zeit pro Bild ohne Warten (in Sekunden)
+        self.boost_time_left = 0.0
+
+
+    def notice_input(self) -> None:
+        self.boost_time_left = FrameGovernor.INPUT_BOOST_TIME
+
+
+    def record_work_time(self, seconds: float) -> None:
+        self.work_time += (seconds - self.work_time) * FrameGovernor.SMOOTHING
+
+
+    def target_fps(self, animating: bool, dt: float) -> int:
+        self.boost_time_left = max(0.0, self.boost_time_left - dt)
+        fps = FrameGovernor.HIGH_FPS if animating or self.boost_time_left > 0 else FrameGovernor.LOW_FPS
+        if self.work_time > 0:
+            # zurückschalten, wenn die Renderzeit das Budget überschreitet:
+            fps = min(fps, int(FrameGovernor.BUDGET_SHARE / self.work_time))
+        return max(FrameGovernor.MIN_FPS, fps)
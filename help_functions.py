@@ -8,9 +8,22 @@ from basic_classes import Color
 
 # -----------
 
-def load_bad_words() -> list[str]:
+# Zeichen, die wie Buchstaben aussehen und deshalb vor dem Vergleich mit den bösen Wörtern ersetzt werden
+LOOKALIKES = str.maketrans({'0': 'O', '1': 'I', '3': 'E', '4': 'A', '5': 'S', '6': 'G', '7': 'T', '8': 'B', '$': 'S', '@': 'A',
+                            '|': 'I', '!': 'I'})
+
+
+def load_bad_words() -> frozenset[str]:
     with open('bad_words.txt') as file:
-        return file.read().split('\n')
+        return frozenset(normalize_name(w) for w in file.read().split('\n') if w.strip())
+
+
+def normalize_name(name: str) -> str:
+    return name.strip().upper().translate(LOOKALIKES)
+
+
+def is_bad_name(name: str, bad_words: frozenset[str]) -> bool:
+    return normalize_name(name) in bad_words
 
 
 def load_translations() -> dict[str, dict[str, str]]:
@@ -76,9 +89,9 @@ def __scale_color(color: tuple[int, int, int], factor: float) -> tuple[int, int,
 
 # ----------
 
-def mouse_on_rect(rect: tuple[float, float, float, float]) -> bool:
+def mouse_on_rect(rect: tuple[float, float, float, float], mouse_pos: tuple[int, int]) -> bool:
     (x, y, width, height) = rect
-    (mouse_x, mouse_y) = pygame.mouse.get_pos()
+    (mouse_x, mouse_y) = mouse_pos
     if mouse_x < x:
         return False
     if mouse_x >= x + width:
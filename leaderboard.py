@@ -0,0 +1,245 @@
+import argparse
+import asyncio
+import json
+import os
+import queue
+import threading
+import uuid
+
+from autosave import write_file_atomically
+
+
+# Server und Client tauschen über eine dauerhafte TCP-Verbindung JSON-Zeilen aus. Der Client schickt
+#     {"board": ..., "since": ..., "scores": [...]}
+# mit allen noch nicht bestätigten Punktzahlen und der zuletzt gesehenen Version der Bestenliste. Der Server antwortet mit
+#     {"board": ..., "version": ..., "full": ..., "scores": [...]}
+# und schickt dabei nur die Einträge, die seit dieser Version in die Bestenliste gekommen sind (oder die ganze Liste, wenn
+# der Client zu weit zurückliegt oder der Server neu gestartet wurde).
+
+N_HIGH_SCORES = 10
+LOG_LENGTH = 100  # wie viele Änderungen sich der Server für Deltas merkt
+DEFAULT_PORT = 47810
+
+
+def score_key(score: dict) -> tuple:
+    return (score['timestamp'], score['playerName'], score['score'])
+
+
+def merge_scores(scores: list[dict], new_scores: list[dict]) -> list[dict]:
+    # gibt die besten N_HIGH_SCORES der vereinigten Listen ohne Duplikate zurück
+    merged = {score_key(s): s for s in scores}
+    for s in new_scores:
+        merged.setdefault(score_key(s), s)
+    return sorted(merged.values(), key=lambda s: s['score'])[:N_HIGH_SCORES]
+
+
+class LeaderboardServer:
+
+    def __init__(self, path: str, flush_interval: float = 2.0) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self.board_id = uuid.uuid4().hex  # ändert sich bei jedem Start, damit Clients dann die ganze Liste holen
+        self.version = 0
+        self.log: list[tuple[int, dict]] = []  # (Version, Eintrag) für jeden neuen Eintrag in der Bestenliste
+        self.dirty = False
+        try:
+            with open(path, encoding='UTF-8') as file:
+                self.scores: list[dict] = json.load(file)
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            self.scores = []
+
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        flush_task = asyncio.create_task(self.flush_loop())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            flush_task.cancel()
+            await self.flush()
+
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                response = self.sync(json.loads(line))
+                writer.write(json.dumps(response, separators=(',', ':')).encode('UTF-8') + b'\n')
+                await writer.drain()
+        except (ConnectionError, ValueError, KeyError, TypeError):
+            pass  # Verbindung abgebrochen oder ungültige Anfrage
+        finally:
+            writer.close()
+
+
+    def sync(self, request: dict) -> dict:
+        for s in request.get('scores', []):
+            self.add_score(s)
+        since = request.get('since', 0)
+        oldest_logged_version = self.log[0][0] if self.log else self.version + 1
+        full = request.get('board') != self.board_id or since < oldest_logged_version - 1 or since > self.version
+        if full:
+            scores = self.scores
+        else:
+            scores = [s for (v, s) in self.log if v > since]
+        return {'board': self.board_id, 'version': self.version, 'full': full, 'scores': scores}
+
+
+    def add_score(self, score: dict) -> None:
+        scores = merge_scores(self.scores, [score])
+        if scores == self.scores:
+            return  # schon bekannt oder nicht gut genug
+        self.scores = scores
+        self.version += 1
+        self.log.append((self.version, score))
+        del self.log[:-LOG_LENGTH]
+        self.dirty = True
+
+
+    async def flush_loop(self) -> None:
+        # die Bestenliste gesammelt in Abständen speichern statt bei jeder Punktzahl
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+    async def flush(self) -> None:
+        if not self.dirty:
+            return
+        self.dirty = False
+        data = json.dumps(self.scores, indent=4)
+        await asyncio.get_running_loop().run_in_executor(None, write_file_atomically, self.path, data)
+
+
+# Läuft in einem eigenen Thread mit eigener Ereignisschleife, damit der Spielloop nie auf das Netzwerk wartet.
+# Punktzahlen werden in einer lokalen Warteschlange gehalten, bis der Server sie bestätigt hat; ohne Server bleiben sie
+# dort und werden nach dem nächsten Verbindungsaufbau übertragen. Die Warteschlange wird nach jeder Änderung in der Datei
+# queue_path gespeichert, damit auch ein Absturz oder das Ausschalten des Kiosks keine Punktzahlen verliert.
+class LeaderboardClient:
+
+    SYNC_INTERVAL = 5.0  # so oft werden ohne neue Punktzahlen Änderungen abgefragt (in Sekunden)
+    RECONNECT_INTERVAL = 3.0
+    TIMEOUT = 5.0
+
+    def __init__(self, host: str, port: int, queue_path: str) -> None:
+        self.host = host
+        self.port = port
+        self.queue_path = queue_path
+        self.lock = threading.Lock()
+        try:
+            with open(queue_path, encoding='UTF-8') as file:
+                self.pending: list[dict] = json.load(file)
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            self.pending = []
+        self.updates: queue.SimpleQueue[list[dict]] = queue.SimpleQueue()  # vom Server erhaltene Einträge
+        self.board_id: str | None = None
+        self.version = 0
+        self.online = False
+        self.closing = False
+        self.loop = asyncio.new_event_loop()
+        self.wake_event: asyncio.Event | None = None
+        self.thread = threading.Thread(target=self.loop.run_until_complete, args=(self.run(),), name='leaderboard-client',
+                                       daemon=True)
+        self.thread.start()
+
+
+    def submit(self, score: dict) -> None:
+        with self.lock:
+            self.pending.append(score)
+        self.loop.call_soon_threadsafe(self.save_pending)  # im Thread des Clients speichern, nicht im Spielloop
+        self.wake()
+
+
+    def poll(self) -> list[dict]:
+        # gibt alle seit dem letzten Aufruf vom Server erhaltenen Einträge zurück, ohne zu blockieren
+        scores = []
+        while not self.updates.empty():
+            scores += self.updates.get()
+        return scores
+
+
+    def close(self) -> None:
+        self.closing = True
+        self.wake()
+        self.thread.join(timeout=1)
+        self.save_pending()
+
+
+    def save_pending(self) -> None:
+        with self.lock:
+            pending = list(self.pending)
+        if pending:
+            write_file_atomically(self.queue_path, json.dumps(pending))
+        elif os.path.exists(self.queue_path):
+            os.remove(self.queue_path)
+
+
+    def wake(self) -> None:
+        if self.wake_event is not None:
+            self.loop.call_soon_threadsafe(self.wake_event.set)
+
+
+    async def run(self) -> None:
+        self.wake_event = asyncio.Event()
+        while not self.closing:
+            try:
+                (reader, writer) = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.TIMEOUT)
+            except (OSError, asyncio.TimeoutError):
+                await self.sleep(self.RECONNECT_INTERVAL)
+                continue
+            self.online = True
+            try:
+                while not self.closing:
+                    await self.sync(reader, writer)
+                    await self.sleep(self.SYNC_INTERVAL)
+            except (OSError, asyncio.TimeoutError, ValueError):
+                pass
+            finally:
+                self.online = False
+                writer.close()
+            await self.sleep(self.RECONNECT_INTERVAL)
+
+
+    async def sync(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        with self.lock:
+            batch = list(self.pending)
+        request = {'board': self.board_id, 'since': self.version, 'scores': batch}
+        writer.write(json.dumps(request, separators=(',', ':')).encode('UTF-8') + b'\n')
+        await writer.drain()
+        line = await asyncio.wait_for(reader.readline(), self.TIMEOUT)
+        if not line:
+            raise ConnectionResetError('leaderboard server closed the connection')
+        response = json.loads(line)
+        with self.lock:
+            del self.pending[:len(batch)]  # bestätigt; inzwischen hinzugekommene bleiben in der Warteschlange
+        if batch:
+            self.save_pending()
+        (self.board_id, self.version) = (response['board'], response['version'])
+        if response['scores']:
+            self.updates.put(response['scores'])
+
+
+    async def sleep(self, seconds: float) -> None:
+        # wartet, bis die Zeit abgelaufen ist oder wake() aufgerufen wurde
+        try:
+            await asyncio.wait_for(self.wake_event.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+        self.wake_event.clear()
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    (host, _, port) = address.rpartition(':')
+    return (host, int(port)) if host else (address, DEFAULT_PORT)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='shared leaderboard server for several Math Game kiosks')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--file', default='leaderboard.json', help='where the shared leaderboard is stored')
+    options = parser.parse_args()
+    try:
+        asyncio.run(LeaderboardServer(options.file).serve(options.host, options.port))
+    except KeyboardInterrupt:
+        pass
@@ -1,15 +1,24 @@
 from __future__ import annotations
 
+import argparse
 import json
+import leaderboard
 import locale
+import os
 import pygame
+import random
+import recording
 import time
 
 from typing import Callable, override
 
 
 # Eigene Imports:
+from analytics import AnalyticsStore
+from autosave import Autosaver
 from basic_classes import *
+from diagnostics import LatencyHistogram, MemoryProfiler
+from frame_governor import FrameGovernor
 from help_functions import *
 from problems import *
 
@@ -17,7 +26,7 @@ from problems import *
 class Button:
 
     def __init__(self, x: float, y: float, width: int, height: int, bg_color: tuple[int, int, int],
-                 on_action: Callable[[], None]) -> None:
+                 on_action: Callable[[], None] | None) -> None:
         self.x = x
         self.y = y
         self.width = width
@@ -41,9 +50,13 @@ class Button:
         pygame.draw.rect(screen, bg_color, (self.x, self.y + y_offset, self.width, self.height), border_radius=10)
 
 
-    def check_hovered(self, y_offset: float) -> None:
+    def check_hovered(self, y_offset: float, mouse_pos: tuple[int, int]) -> None:
         if self.active:
-            self.hovered = mouse_on_rect((self.x, self.y + y_offset, self.width, self.height))
+            self.hovered = self.contains(y_offset, mouse_pos)
+
+
+    def contains(self, y_offset: float, pos: tuple[float, float]) -> bool:
+        return mouse_on_rect((self.x, self.y + y_offset, self.width, self.height), pos)
 
 
     def deactivate(self) -> None:
@@ -52,18 +65,31 @@ class Button:
         self.pressed = False
 
 
+    def trigger(self, event_time: float) -> None:
+        # event_time: wann das auslösende Event eingetroffen ist
+        self.on_action()
+
+
 class TextButton(Button):
 
     def __init__(self, text: str, x: float, y: float, width: int, bg_color: tuple[int, int, int],
-                 on_action: Callable[[], None]) -> None:
+                 on_action: Callable[[], None] | None) -> None:
         super().__init__(x, y, width, TEXT_BUTTON_HEIGHT, bg_color, on_action)
         self.text = text
+        self.text_surface: pygame.Surface | None = None  # die vorgerenderte Beschriftung (falls vorhanden)
 
 
     def render(self, screen: pygame.Surface, y_offset: int = 0) -> None:
         super().render(screen, y_offset)
         pygame.draw.rect(screen, Color.WHITE, (self.x, self.y + y_offset, self.width, self.height), width=3, border_radius=10)
-        render_text(screen, self.text, BUTTON_FONT, self.x + self.width / 2, self.y + 16 + y_offset, TextAlign.CENTER)
+        if self.text_surface is None:
+            render_text(screen, self.text, BUTTON_FONT, self.x + self.width / 2, self.y + 16 + y_offset, TextAlign.CENTER)
+        else:
+            blit_text(screen, self.text_surface, self.x + self.width / 2, self.y + 16 + y_offset, TextAlign.CENTER)
+
+
+    def prerender(self) -> None:
+        self.text_surface = BUTTON_FONT.render(self.text, True, Color.WHITE)
 
 
 class MenuButton(TextButton):
@@ -75,12 +101,18 @@ class MenuButton(TextButton):
 class OptionButton(TextButton):
 
     def __init__(self, option: int, x: float, bg_color: tuple[int, int, int],
-                 on_action: Callable[[], None]) -> None:
-        super().__init__(str(option), x, 320, OPTION_BUTTON_WIDTH, bg_color, on_action)
+                 on_answer: Callable[[int, float], None]) -> None:
+        super().__init__(str(option), x, 320, OPTION_BUTTON_WIDTH, bg_color, None)
         self.option = option
+        self.on_answer = on_answer
         self.feedback_border_color: tuple[int, int, int] | None = None
 
 
+    @override
+    def trigger(self, event_time: float) -> None:
+        self.on_answer(self.option, event_time)  # die Reaktionszeit wird bis zum Eintreffen des Events gemessen
+
+
     def render(self, screen: pygame.Surface, y_offset: int = 0) -> None:
         if self.feedback_border_color is not None:
             pygame.draw.rect(screen, self.feedback_border_color, (self.x - 10, self.y + y_offset - 10, self.width + 20, self.height + 20),
@@ -93,6 +125,7 @@ class ButtonContainer:
     def __init__(self, buttons: tuple[Button, ...]) -> None:
         self.buttons = buttons
         self.buttons_y_offset: float = 0
+        self.touched_buttons: dict[int, Button] = {}  # die von einem Finger (finger_id) gedrückten Schaltflächen
 
 
     def render(self, screen: pygame.Surface) -> None:
@@ -100,9 +133,11 @@ class ButtonContainer:
             b.render(screen, self.buttons_y_offset)
 
 
-    def check_buttons_hovered(self) -> None:
+    def check_buttons_hovered(self, mouse_pos: tuple[int, int] | None = None) -> None:
+        if mouse_pos is None:
+            mouse_pos = get_mouse_pos()
         for b in self.buttons:
-            b.check_hovered(self.buttons_y_offset)
+            b.check_hovered(self.buttons_y_offset, mouse_pos)
 
 
     def check_button_pressed(self) -> None:
@@ -112,15 +147,45 @@ class ButtonContainer:
                 return
 
 
-    def check_button_released(self) -> None:
+    def check_button_released(self, event_time: float) -> None:
         for b in self.buttons:
             if b.pressed:
                 b.pressed = False
                 if b.hovered:
-                    b.on_action()
+                    b.trigger(event_time)
+                return
+
+
+    def handle_finger_down(self, finger_id: int, pos: tuple[float, float]) -> None:
+        for b in self.buttons:
+            if b.active and b.contains(self.buttons_y_offset, pos):
+                b.pressed = True
+                self.touched_buttons[finger_id] = b
                 return
 
 
+    def handle_finger_motion(self, finger_id: int, pos: tuple[float, float]) -> None:
+        b = self.touched_buttons.get(finger_id)
+        if b is not None and b.active:
+            # die Schaltfläche bleibt dem Finger zugeordnet, ist aber nur gedrückt, solange er auf ihr liegt
+            b.pressed = b.contains(self.buttons_y_offset, pos)
+
+
+    def handle_finger_up(self, finger_id: int, pos: tuple[float, float], event_time: float) -> None:
+        b = self.touched_buttons.pop(finger_id, None)
+        if b is None:
+            return
+        b.pressed = b in self.touched_buttons.values()  # ein anderer Finger könnte dieselbe Schaltfläche drücken
+        if b.active and b.contains(self.buttons_y_offset, pos):
+            b.trigger(event_time)
+
+
+    def cancel_touches(self) -> None:
+        for b in self.touched_buttons.values():
+            b.pressed = False
+        self.touched_buttons.clear()
+
+
 class Keyboard(ButtonContainer):
 
     def __init__(self) -> None:
@@ -142,26 +207,39 @@ class Keyboard(ButtonContainer):
 
 
     @staticmethod
-    def make_buttons() -> tuple[TextButton, ...]:
+    def make_buttons() -> tuple[KeyButton, ...]:
         top_row = Keyboard.make_button_row('QWERTYUIOP', 0, 0)
         middle_row = Keyboard.make_button_row('ASDFGHJKL', 20, 80)
         bottom_row = Keyboard.make_button_row('ZXCVBNM', 40, 160)
-        delete_button = TextButton('>delete', KEYBOARD_X + 625, KEYBOARD_Y + 175, 180, Color.GRAY, delete_char_in_initials_input)
+        delete_button = KeyButton('>delete', KEYBOARD_X + 625, KEYBOARD_Y + 175, 180, delete_char_in_initials_input)
         return top_row + middle_row + bottom_row + (delete_button,)
 
 
     @staticmethod
-    def make_button_row(chars: str, start_x: float, y: float) -> tuple[TextButton, ...]:
+    def make_button_row(chars: str, start_x: float, y: float) -> tuple[KeyButton, ...]:
         start_x += KEYBOARD_X + 15
         y += KEYBOARD_Y + 15
-        return tuple(TextButton(c, start_x + i * 80, y, 70, Color.GRAY, lambda c=c: type_into_initals_input(c))
+        return tuple(KeyButton(c, start_x + i * 80, y, 70, lambda event_time, c=c: type_into_initals_input(c, event_time))
                      for (i, c) in enumerate(chars))
 
 
+class KeyButton(TextButton):
+
+    def __init__(self, text: str, x: float, y: float, width: int, on_key: Callable[[float], None]) -> None:
+        super().__init__(text, x, y, width, Color.GRAY, None)
+        self.on_key = on_key
+
+
+    @override
+    def trigger(self, event_time: float) -> None:
+        self.on_key(event_time)  # die Zeit des Events wird für die Latenzmessung gebraucht
+
+
 class ProblemDisplay(ButtonContainer):
 
     def __init__(self, problem: Problem) -> None:
         self.term = problem.term
+        self.term_surface: pygame.Surface | None = None  # der vorgerenderte Term (wird in prerender() gesetzt)
         option_button_1 = ProblemDisplay.make_button(problem.options[0], WIDTH / 2 - OPTION_BUTTON_WIDTH * 1.7, Color.BLUE)
         option_button_2 = ProblemDisplay.make_button(problem.options[1], WIDTH / 2 - OPTION_BUTTON_WIDTH * 0.5, Color.YELLOW)
         option_button_3 = ProblemDisplay.make_button(problem.options[2], WIDTH / 2 + OPTION_BUTTON_WIDTH * 0.7, Color.RED)
@@ -172,13 +250,21 @@ class ProblemDisplay(ButtonContainer):
 
     def render(self, screen: pygame.Surface) -> None:
         screen.fill(Color.DARK_GRAY)
-        render_text(screen, self.term, TITLE_FONT, WIDTH / 2, 180, TextAlign.CENTER)
+        if self.term_surface is None:
+            self.prerender()
+        blit_text(screen, self.term_surface, WIDTH / 2, 180, TextAlign.CENTER)
         super().render(screen)
 
 
+    def prerender(self) -> None:
+        self.term_surface = TITLE_FONT.render(self.term, True, Color.WHITE)
+        for b in self.option_buttons:
+            b.prerender()
+
+
     @staticmethod
     def make_button(option: int, x: float, bg_color: tuple[int, int, int]) -> OptionButton:
-        return OptionButton(option, x, bg_color, on_action=lambda: log_in_answer(option))
+        return OptionButton(option, x, bg_color, on_answer=log_in_answer)
 
 
 class Menu(ButtonContainer):
@@ -204,10 +290,12 @@ class Menu(ButtonContainer):
 class ResultMenu(Menu):
 
     @override
-    def check_buttons_hovered(self) -> None:
-        super().check_buttons_hovered()
+    def check_buttons_hovered(self, mouse_pos: tuple[int, int] | None = None) -> None:
+        if mouse_pos is None:
+            mouse_pos = get_mouse_pos()
+        super().check_buttons_hovered(mouse_pos)
         if is_place_on_leaderboard:
-            KEYBOARD.check_buttons_hovered()
+            KEYBOARD.check_buttons_hovered(mouse_pos)
 
 
     @override
@@ -218,14 +306,39 @@ class ResultMenu(Menu):
 
 
     @override
-    def check_button_released(self) -> None:
-        super().check_button_released()
+    def check_button_released(self, event_time: float) -> None:
+        super().check_button_released(event_time)
         if is_place_on_leaderboard:
-            KEYBOARD.check_button_released()
+            KEYBOARD.check_button_released(event_time)
+
+
+    @override
+    def handle_finger_down(self, finger_id: int, pos: tuple[float, float]) -> None:
+        super().handle_finger_down(finger_id, pos)
+        if is_place_on_leaderboard and finger_id not in self.touched_buttons:
+            KEYBOARD.handle_finger_down(finger_id, pos)
+
+
+    @override
+    def handle_finger_motion(self, finger_id: int, pos: tuple[float, float]) -> None:
+        super().handle_finger_motion(finger_id, pos)
+        KEYBOARD.handle_finger_motion(finger_id, pos)
+
+
+    @override
+    def handle_finger_up(self, finger_id: int, pos: tuple[float, float], event_time: float) -> None:
+        super().handle_finger_up(finger_id, pos, event_time)
+        KEYBOARD.handle_finger_up(finger_id, pos, event_time)
+
+
+    @override
+    def cancel_touches(self) -> None:
+        super().cancel_touches()
+        KEYBOARD.cancel_touches()
 
 
 TRANSLATIONS: dict[str, dict[str, str]]  # die Übersetzungen aus der Datei translations.json
-BAD_WORDS: list[str]  # die Liste der bösen Wörter aus drei Buchstaben, die man nicht als Namenskürzel verwenden kann
+BAD_WORDS: frozenset[str]  # die (normalisierten) bösen Wörter aus drei Buchstaben, die man nicht als Namenskürzel verwenden kann
 
 WIDTH: int  # die Breite der Anzeige (wird in init_constants() gesetzt)
 HEIGHT: int  # die Höhe der Anzeige (wird in init_constants() gesetzt)
@@ -239,8 +352,8 @@ KEYBOARD_X: float
 KEYBOARD_Y: float
 KEYBOARD_RECT: tuple[float, float, float, float]
 
-FPS = 100  # die Bildfrequenz
-FEEDBACK_SYMBOL_SHOWING_TIME = int(FPS * 1.2)  # wie lange ein Feedback-Symbol (Haken oder Kreuz) angezeigt wird
+INITIALS_REJECTED_SHOWING_TIME = 0.5  # wie lange die Eingabefelder nach einem abgelehnten Buchstaben rot sind (in Sekunden)
+FEEDBACK_SYMBOL_SHOWING_TIME = 1.2  # wie lange ein Feedback-Symbol (Haken oder Kreuz) angezeigt wird (in Sekunden)
 
 N_PROBLEMS_FOR_OPERATOR = (3, 3, 2, 2)
 N_PROBLEMS = sum(N_PROBLEMS_FOR_OPERATOR)
@@ -260,72 +373,281 @@ LANGUAGE_MENU: Menu
 CREDITS_MENU: Menu
 KEYBOARD: Keyboard
 
+RECORD: bool  # wahr, wenn die Sitzung aufgezeichnet werden soll
+LOGICAL_SIZE: tuple[int, int] | None  # die logische Auflösung, in der gerendert wird (None: die Auflösung der Anzeige)
+SCALED_OUTPUT: bool  # wahr, wenn SDL das Skalieren auf die Anzeige übernimmt (pygame.SCALED)
+DISPLAY: pygame.Surface  # die Oberfläche des Fensters
+PRESENT_SURFACE: pygame.Surface | None  # der Bereich des Fensters, in den die logische Oberfläche skaliert wird
+PRESENT_RECT: tuple[int, int, int, int] | None  # die Lage dieses Bereichs im Fenster
+
+RECORDER: recording.SessionRecorder | None  # zeichnet die Sitzung auf (nicht beim Abspielen und mit --no-record)
+REPLAYER: recording.Replayer | None  # spielt eine aufgezeichnete Sitzung ab (nur mit --replay)
+HEADLESS: bool  # wahr, wenn ohne Fenster und so schnell wie möglich abgespielt wird
+LEADERBOARD_CLIENT: leaderboard.LeaderboardClient | None  # gleicht die Bestenliste mit einem Server ab (nur mit --leaderboard-server)
+AUTOSAVER: Autosaver | None  # speichert die Sprache und die Highscores im Hintergrund (nicht beim Abspielen)
+ANALYTICS: AnalyticsStore | None  # sammelt die Antworten für die Auswertung (nicht beim Abspielen)
+
+LATENCY_HISTOGRAM: LatencyHistogram | None  # misst die Eingabe-bis-Anzeige-Latenz (nur mit --measure-latency)
+MEMORY_PROFILER: MemoryProfiler | None  # misst den Speicherverbrauch pro Bild (nur mit --profile-memory)
+
 
 running = True  # so lange wahr, solange das Spiel läuft
+frame_index = 0  # die Nummer des aktuellen Bildes
+session_start_time: float  # der Zeitpunkt, an dem die Sitzung gestartet wurde
 language: str
-opened_menu: Menu | None
+opened_menu: Menu | None = None
 high_scores: list[Score]
 input_initials: str
+initials_rejected_time: float | None = None  # wann zuletzt ein Buchstabe abgelehnt wurde, weil er ein böses Wort ergeben hätte
 
 # Variablen, die für jeden Durchlauf benötigt werden:
 problems: tuple[Problem]  # die in einem Durchlauf zu lösenden Probleme
 problem_index: int  # der Index des aktuellen Problems
+problem_displays: tuple[ProblemDisplay, ...]  # die Anzeigen aller Probleme (werden in new_game() angelegt)
 problem_display: ProblemDisplay | None  # die Anzeige des aktuellen Problems
 correct_answers: list[bool]
+reaction_times: list[float]  # die Reaktionszeiten der bisherigen Antworten in Sekunden
+problem_shown_time: float | None  # der Zeitpunkt, an dem das aktuelle Problem zum ersten Mal angezeigt wurde
+frame_time: float  # der Zeitpunkt, an dem das aktuelle Bild begonnen hat (die Events tragen ihre eigenen Zeitstempel)
 is_correct_answer: bool
 n_correct: int
-game_ticks: int
+game_time: float  # die angezeigte Spielzeit in Sekunden (läuft nicht, während ein Feedback-Symbol angezeigt wird)
 solving_time: float
 score: float
 place: int
 is_place_on_leaderboard: bool
 timestamp: int
-feedback_symbol_showing_ticks: int
+feedback_symbol_start_time: float | None  # seit wann das Feedback-Symbol angezeigt wird (None: keins)
+next_problem_prerendered: bool
 
 
 # Die main()-Funktion:
 def main() -> None:    
+    init_options()  # die Kommandozeilenoptionen auswerten
+    if HEADLESS:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'  # ohne Fenster abspielen
     pygame.init()  # Pygame initialisieren
     pygame.font.init()  # das Rendern von Schrift in Pygame initialisieren
 
-    screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)  # das Fenster im Vollbildmodus anlegen
+    screen = init_display()  # das Fenster im Vollbildmodus anlegen
     init(screen)  # dieses Spiel initialisieren
 
     open_menu(MAIN_MENU)  # das Hauptmenü öffnen
 
-    clock = pygame.time.Clock()  # Mit dieser Uhr kann die Bildfrequenz geregelt werden
+    governor = FrameGovernor()  # wählt die Bildfrequenz für jedes Bild
+    render_time = 0.0  # die Zeit, die insgesamt mit Rendern verbracht wurde
+    dt = 0.0  # die Dauer des letzten Bildes in Sekunden
+    waited_events: list[tuple[pygame.event.Event, float]] = []  # die beim Warten auf das Bild eingetroffenen Events
 
     # Spielloop:
     while running:
-        # Event-Handling:
-        for event in pygame.event.get():
-            match event.type:
-                case pygame.MOUSEMOTION:  # bei einem Mausbewegungsevent
-                    handle_mouse_motion_event()
-                case pygame.MOUSEBUTTONDOWN:  # bei einem Mausdruckevent
-                    handle_mouse_button_down_event(event)
-                case pygame.MOUSEBUTTONUP:  # bei einem Maustaste-loslass-Event
-                    handle_mouse_button_up_event(event)
-                case pygame.QUIT:  # bei einem Spiel-beendet-Event
-                    quit_game()
-
-        update()  # die Funktion update() aktualisiert den Spielzustand
+        frame_start_time = time.perf_counter()
+        if MEMORY_PROFILER is not None:
+            MEMORY_PROFILER.begin_frame(get_screen_name())
+        if REPLAYER is not None:
+            REPLAYER.advance(dt)
+        stamp_frame_time()
+        events = get_events(waited_events)
+        if events:
+            governor.notice_input()
+
+        # update() läuft vor dem Event-Handling, damit eine Eingabe immer den Zustand trifft, der zu ihrem Zeitstempel gehört
+        # (das macht auch das Abspielen von Aufzeichnungen unabhängig von der Bildfrequenz):
+        update(dt)  # die Funktion update() aktualisiert den Spielzustand
+        handle_events(events)
+
+        render_start_time = time.perf_counter()
         render(screen)  # die Funktion render() rendert alles, was angezeigt werden soll
+        present(screen)  # das logische Bild gegebenenfalls auf die Anzeige skalieren
         pygame.display.flip()  # das neu gerenderte Bild im Fenster anzeigen
-
-        clock.tick(FPS)  # das Programm so lange zur Ruhe legen, dass 60 Bilder pro Sekunde erreicht werden
+        render_time += time.perf_counter() - render_start_time
+        mark_problem_shown()  # ab diesem Bild läuft die Reaktionszeit für das aktuelle Problem
+        if LATENCY_HISTOGRAM is not None:
+            LATENCY_HISTOGRAM.stop()  # die Latenz der in diesem Bild sichtbar gewordenen Eingabe erfassen
+        if MEMORY_PROFILER is not None:
+            MEMORY_PROFILER.end_frame()
+
+        if REPLAYER is not None and REPLAYER.finished() and now() > REPLAYER.last_event_time + FEEDBACK_SYMBOL_SHOWING_TIME:
+            quit_game()  # die Aufzeichnung ist zu Ende
+        governor.record_work_time(time.perf_counter() - frame_start_time)
+        if HEADLESS:
+            dt = 1 / FrameGovernor.HIGH_FPS
+        else:
+            # bis zum nächsten Bild auf Events warten, damit die gewählte Bildfrequenz erreicht wird:
+            waited_events = wait_for_events(frame_start_time + 1 / governor.target_fps(opened_menu is None, dt))
+            dt = time.perf_counter() - frame_start_time
+        next_frame()
 
     # Nach der Spielschleife:
+    if MEMORY_PROFILER is not None:
+        MEMORY_PROFILER.close()  # einen letzten Bericht in die Datei memory.log schreiben
+    if REPLAYER is not None:
+        print_replay_summary(render_time)
+        pygame.quit()
+        return
     if opened_menu is RESULT_MENU:  # falls das Ergebnismenü geöffnet ist
         add_score_to_high_scores()  # die Punktzahl zu den Highscores hinzufügen, falls sie ein Highscore ist
     save_data()  # die Sprache und die Highscores in der Datei data.json speichern
+    AUTOSAVER.close()  # warten, bis sie geschrieben sind
+    if RECORDER is not None:
+        RECORDER.close()  # die restlichen Datensätze der Aufzeichnung schreiben
+    if ANALYTICS is not None:
+        ANALYTICS.close()  # die Antworten abgebrochener Durchläufe in die Spaltendateien schreiben und darauf warten
+    if LEADERBOARD_CLIENT is not None:
+        LEADERBOARD_CLIENT.close()  # noch nicht übertragene Punktzahlen für den nächsten Start aufheben
+    if LATENCY_HISTOGRAM is not None:
+        LATENCY_HISTOGRAM.dump('latency.txt')  # das Latenz-Histogramm in der Datei latency.txt speichern
     pygame.font.quit()  # das Rendern von Schrift in Pygame beenden
     pygame.mixer.quit()  # den Soundmixer von Pygame beenden
     pygame.quit()  # das Spiel sauber beenden
 
 
+def wait_for_events(deadline: float) -> list[tuple[pygame.event.Event, float]]:
+    # Statt zu schlafen wird bis deadline auf Events gewartet und jedes Event beim Eintreffen gestempelt (Pygame gibt den
+    # SDL-Zeitstempel nicht weiter). Nur Events, die während update() und render() eintreffen, werden verspätet gestempelt.
+    events = []
+    while (timeout := deadline - time.perf_counter()) > 0:
+        event = pygame.event.wait(max(1, int(timeout * 1000)))
+        if event.type != pygame.NOEVENT:
+            events.append((event, now()))
+    return events
+
+
+def get_events(waited_events: list[tuple[pygame.event.Event, float]]) -> list[tuple[pygame.event.Event, float]]:
+    # gibt die Events mit ihren Zeitstempeln zurück; was erst nach dem Warten eingetroffen ist, bekommt die Zeit des Bildes
+    events = waited_events + [(e, frame_time) for e in pygame.event.get()]
+    if REPLAYER is None:
+        return events
+    # beim Abspielen zählt vom Fenster nur das Schließen, alle anderen Events kommen aus der Aufzeichnung
+    return [(e, t) for (e, t) in events if e.type == pygame.QUIT] + \
+        [(to_pygame_event(e), e.event_time) for e in REPLAYER.due_events()]
+
+
+def handle_events(events: list[tuple[pygame.event.Event, float]]) -> None:
+    # Bewegungen werden pro Bild zusammengefasst: von der Maus zählt nur die letzte, von jedem Finger die letzte vor seinem
+    # Loslassen (bzw. am Ende des Bildes). Aufgezeichnet werden nur die so behandelten Events.
+    motion: tuple[pygame.event.Event, float] | None = None  # das letzte Mausbewegungsevent in diesem Bild
+    finger_motions: dict[int, tuple[pygame.event.Event, float]] = {}  # das letzte Bewegungsevent jedes Fingers
+    for (event, event_time) in events:
+        if event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP) and event.touch:
+            continue  # von SDL aus Touch-Events nachgebildete Mausevents ignorieren
+        match event.type:
+            case pygame.MOUSEMOTION:  # bei einem Mausbewegungsevent nur das Event merken
+                motion = (event, event_time)
+                continue
+            case pygame.MOUSEBUTTONDOWN | pygame.MOUSEBUTTONUP:
+                motion = None  # die Position des Maustastenevents ist aktueller
+            case pygame.FINGERMOTION:
+                finger_motions[event.finger_id] = (event, event_time)
+                continue
+            case pygame.FINGERDOWN | pygame.FINGERUP:
+                if event.finger_id in finger_motions:
+                    handle_event(*finger_motions.pop(event.finger_id))  # die Bewegung davor noch behandeln
+        handle_event(event, event_time)
+    for finger_motion in finger_motions.values():
+        handle_event(*finger_motion)
+    if motion is not None:
+        handle_event(*motion)
+
+
+def handle_event(event: pygame.event.Event, event_time: float) -> None:
+    if RECORDER is not None:
+        record_event(event, event_time)
+    match event.type:
+        case pygame.MOUSEMOTION:  # bei einem Mausbewegungsevent
+            handle_mouse_motion_event(to_logical(event.pos))
+        case pygame.MOUSEBUTTONDOWN:  # bei einem Mausdruckevent
+            handle_mouse_button_down_event(event)
+        case pygame.MOUSEBUTTONUP:  # bei einem Maustaste-loslass-Event
+            handle_mouse_button_up_event(event, event_time)
+        case pygame.FINGERDOWN:  # bei einem Fingerberührungsevent
+            handle_finger_down_event(event)
+        case pygame.FINGERMOTION:  # bei einem Fingerbewegungsevent
+            handle_finger_motion_event(event)
+        case pygame.FINGERUP:  # bei einem Finger-loslass-Event
+            handle_finger_up_event(event, event_time)
+        case pygame.QUIT:  # bei einem Spiel-beendet-Event
+            quit_game()
+
+
 # Initialisierungsfunktionen
 
+def init_options() -> None:
+    global LOGICAL_SIZE, SCALED_OUTPUT, REPLAYER, HEADLESS, RECORD, LEADERBOARD_CLIENT, LATENCY_HISTOGRAM, MEMORY_PROFILER
+    parser = argparse.ArgumentParser(description='Math Game for the Action Day')
+    parser.add_argument('--logical-size', metavar='WIDTHxHEIGHT',
+                        help='render at this resolution and scale the result to the display, e.g. 1920x1080')
+    parser.add_argument('--scaled', action='store_true',
+                        help='let SDL scale the logical resolution to the display (pygame.SCALED) instead of a scaled blit')
+    parser.add_argument('--measure-latency', action='store_true',
+                        help='measure the input-to-display latency and write a histogram to latency.txt on exit')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='sample tracemalloc and GC statistics per screen and write them to the rotating log memory.log')
+    parser.add_argument('--no-record', action='store_true', help='do not record this session to the recordings directory')
+    parser.add_argument('--replay', metavar='FILE', help='replay a recorded session instead of playing')
+    parser.add_argument('--headless', action='store_true', help='replay without a window as fast as possible')
+    parser.add_argument('--leaderboard-server', metavar='HOST[:PORT]',
+                        help='share the leaderboard with other kiosks through this server (see leaderboard.py)')
+    options = parser.parse_args()
+    if options.headless and options.replay is None:
+        parser.error('--headless requires --replay')
+    if options.replay is not None and (options.logical_size is not None or options.measure_latency):
+        parser.error('--replay cannot be combined with --logical-size or --measure-latency')
+    REPLAYER = recording.Replayer(recording.Session(options.replay)) if options.replay is not None else None
+    HEADLESS = options.headless
+    RECORD = REPLAYER is None and not options.no_record
+    if options.leaderboard_server is not None and REPLAYER is None:
+        (host, port) = leaderboard.parse_address(options.leaderboard_server)
+        LEADERBOARD_CLIENT = leaderboard.LeaderboardClient(host, port, 'leaderboard_queue.json')
+    else:
+        LEADERBOARD_CLIENT = None
+    if options.logical_size is None:
+        if options.scaled:
+            parser.error('--scaled requires --logical-size')
+        LOGICAL_SIZE = None
+    else:
+        try:
+            (logical_width, logical_height) = (int(n) for n in options.logical_size.lower().split('x'))
+        except ValueError:
+            parser.error('--logical-size must look like 1920x1080')
+        if logical_width <= 0 or logical_height <= 0:
+            parser.error('--logical-size must be positive')
+        if logical_width < KEYBOARD_WIDTH or logical_height < KEYBOARD_HEIGHT:
+            parser.error(f'--logical-size must be at least {KEYBOARD_WIDTH}x{KEYBOARD_HEIGHT} to fit the on-screen keyboard')
+        LOGICAL_SIZE = (logical_width, logical_height)
+    SCALED_OUTPUT = options.scaled
+    LATENCY_HISTOGRAM = LatencyHistogram() if options.measure_latency else None
+    MEMORY_PROFILER = MemoryProfiler('memory.log') if options.profile_memory else None
+
+
+def init_display() -> pygame.Surface:
+    # gibt die Oberfläche zurück, auf die gerendert wird
+    global DISPLAY, PRESENT_SURFACE, PRESENT_RECT
+    PRESENT_SURFACE = None
+    PRESENT_RECT = None
+    if REPLAYER is not None:
+        # beim Abspielen wird in der aufgezeichneten Auflösung gerendert, damit die Positionen der Events passen
+        size = (REPLAYER.session.width, REPLAYER.session.height)
+        DISPLAY = pygame.display.set_mode(size, 0 if HEADLESS else pygame.SCALED)
+        return DISPLAY
+    if LOGICAL_SIZE is None:
+        DISPLAY = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        return DISPLAY
+    if SCALED_OUTPUT:
+        DISPLAY = pygame.display.set_mode(LOGICAL_SIZE, pygame.FULLSCREEN | pygame.SCALED)
+        return DISPLAY
+    DISPLAY = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+    DISPLAY.fill((0, 0, 0))
+    # die logische Oberfläche unter Beibehaltung des Seitenverhältnisses mittig einpassen:
+    (display_width, display_height) = DISPLAY.get_size()
+    (logical_width, logical_height) = LOGICAL_SIZE
+    factor = min(display_width / logical_width, display_height / logical_height)
+    (present_width, present_height) = (round(logical_width * factor), round(logical_height * factor))
+    PRESENT_RECT = ((display_width - present_width) // 2, (display_height - present_height) // 2, present_width, present_height)
+    PRESENT_SURFACE = DISPLAY.subsurface(PRESENT_RECT)
+    return pygame.Surface(LOGICAL_SIZE).convert()
+
+
 def init(screen: pygame.Surface) -> None:
     global BAD_WORDS, TRANSLATIONS, KEYBOARD
     BAD_WORDS = load_bad_words()
@@ -335,6 +657,23 @@ def init(screen: pygame.Surface) -> None:
     init_menus()
     KEYBOARD = Keyboard()
     load_data()
+    init_recording()
+
+
+def init_recording() -> None:
+    global RECORDER, AUTOSAVER, ANALYTICS, session_start_time, high_scores
+    session_start_time = time.perf_counter()
+    RECORDER = None
+    AUTOSAVER = Autosaver('data.json', serialize_data) if REPLAYER is None else None
+    ANALYTICS = AnalyticsStore('analytics') if REPLAYER is None else None
+    if REPLAYER is not None:
+        # den Zustand beim Start der aufgezeichneten Sitzung wiederherstellen:
+        set_language(REPLAYER.session.data['language'])
+        high_scores = [score_from_dict(h) for h in REPLAYER.session.data['highScores']]
+    elif RECORD:
+        os.makedirs('recordings', exist_ok=True)
+        RECORDER = recording.SessionRecorder(time.strftime('recordings/session-%Y%m%d-%H%M%S.mgr'))
+        RECORDER.record_init(WIDTH, HEIGHT, {'language': language, 'highScores': [h.to_dict() for h in high_scores]})
 
 
 def init_constants(screen: pygame.Surface) -> None:
@@ -379,9 +718,9 @@ def init_menus() -> None:
         ButtonData(text='>back', bg_color=Color.PURPLE, on_action=lambda: open_menu(MAIN_MENU))
     ))
     LANGUAGE_MENU = Menu(title='>language', render_content_func=None, button_data=(
-        ButtonData(text='English', bg_color=Color.BLUE, on_action=lambda: set_language('en')),
-        ButtonData(text='Deutsch', bg_color=Color.RED, on_action=lambda: set_language('de')),
-        ButtonData(text='Esperanto', bg_color=Color.GREEN, on_action=lambda: set_language('eo')),
+        ButtonData(text='English', bg_color=Color.BLUE, on_action=lambda: choose_language('en')),
+        ButtonData(text='Deutsch', bg_color=Color.RED, on_action=lambda: choose_language('de')),
+        ButtonData(text='Esperanto', bg_color=Color.GREEN, on_action=lambda: choose_language('eo')),
         ButtonData(text='>back', bg_color=Color.PURPLE, on_action=lambda: open_menu(SETTINGS_MENU))
     ))
     CREDITS_MENU = Menu(title='>credits', render_content_func=show_credits, button_data=(
@@ -392,16 +731,18 @@ def init_menus() -> None:
 
 # Aktualisierungsfunktionen
 
-def update() -> None:
-    global game_ticks, feedback_symbol_showing_ticks
+def update(dt: float) -> None:
+    global game_time, feedback_symbol_start_time, next_problem_prerendered
+    apply_leaderboard_updates()
     if opened_menu is None:
-        if feedback_symbol_showing_ticks == -1:
-            game_ticks += 1
-        else:
-            feedback_symbol_showing_ticks += 1
-            if feedback_symbol_showing_ticks == FEEDBACK_SYMBOL_SHOWING_TIME:
-                feedback_symbol_showing_ticks = -1
-                show_next_problem()
+        if feedback_symbol_start_time is None:
+            game_time += dt
+        elif not next_problem_prerendered:
+            prerender_next_problem()  # die nächste Anzeige vorrendern, solange das Feedback-Symbol angezeigt wird
+            next_problem_prerendered = True
+        elif frame_time - feedback_symbol_start_time >= FEEDBACK_SYMBOL_SHOWING_TIME:
+            feedback_symbol_start_time = None
+            show_next_problem()
 
 
 # Rendering-Funktionen
@@ -411,7 +752,7 @@ def render(screen: pygame.Surface) -> None:
         problem_display.render(screen)
         show_progress(screen)
         show_time(screen)
-        if feedback_symbol_showing_ticks != -1:
+        if feedback_symbol_start_time is not None:
             (show_hook if is_correct_answer else show_cross)(screen, WIDTH)
     else:
         opened_menu.render(screen)
@@ -421,47 +762,136 @@ def render(screen: pygame.Surface) -> None:
 
 # Mausevent-Funktionen
 
-def handle_mouse_motion_event() -> None:
-    get_opened().check_buttons_hovered()
+def handle_mouse_motion_event(mouse_pos: tuple[int, int]) -> None:
+    get_opened().check_buttons_hovered(mouse_pos)
 
 
 def handle_mouse_button_down_event(event: pygame.event.Event) -> None:
+    get_opened().check_buttons_hovered(to_logical(event.pos))  # die noch nicht behandelten Mausbewegungen nachholen
     if event.button == pygame.BUTTON_LEFT:
         get_opened().check_button_pressed()
 
 
-def handle_mouse_button_up_event(event: pygame.event.Event) -> None:
+def handle_mouse_button_up_event(event: pygame.event.Event, event_time: float) -> None:
+    get_opened().check_buttons_hovered(to_logical(event.pos))
     if event.button == pygame.BUTTON_LEFT:
-        get_opened().check_button_released()
+        get_opened().check_button_released(event_time)
+
+
+# Touchevent-Funktionen
+
+def handle_finger_down_event(event: pygame.event.Event) -> None:
+    get_opened().handle_finger_down(event.finger_id, finger_pos(event))
+
+
+def handle_finger_motion_event(event: pygame.event.Event) -> None:
+    get_opened().handle_finger_motion(event.finger_id, finger_pos(event))
+
+
+def handle_finger_up_event(event: pygame.event.Event, event_time: float) -> None:
+    get_opened().handle_finger_up(event.finger_id, finger_pos(event), event_time)
 
 
 # Weitere Funktionen ohne Rückgaben
 
 def new_game() -> None:
-    global problems, problem_index, correct_answers, n_correct, game_ticks, is_correct_answer, feedback_symbol_showing_ticks
+    global problems, problem_displays, problem_index, correct_answers, reaction_times, n_correct, game_time, \
+        is_correct_answer, feedback_symbol_start_time
     open_menu(None)
+    seed = REPLAYER.next_seed() if REPLAYER is not None else random.randrange(2 ** 63)
+    if RECORDER is not None:
+        RECORDER.record_seed(frame_index, now(), seed)
+    random.seed(seed)  # mit dem Startwert lassen sich die Probleme beim Abspielen wiederherstellen
     problems = random_problems(N_PROBLEMS_FOR_OPERATOR)
+    problem_displays = tuple(ProblemDisplay(p) for p in problems)  # alle Anzeigen vorab anlegen
+    problem_displays[0].prerender()
     problem_index = -1
     correct_answers = []
+    reaction_times = []
     n_correct = 0
     is_correct_answer = False
-    game_ticks = 0
-    feedback_symbol_showing_ticks = -1
+    game_time = 0.0
+    feedback_symbol_start_time = None
     show_next_problem()
 
 
 def show_next_problem() -> None:
-    global problem_display, problem_index
+    global problem_display, problem_index, problem_shown_time
     problem_index += 1
+    problem_shown_time = None
     if problem_index == N_PROBLEMS:
         open_result_menu()
     else:
-        problem_display = ProblemDisplay(problems[problem_index])
+        problem_display = problem_displays[problem_index]
         problem_display.check_buttons_hovered()
 
 
+def present(screen: pygame.Surface) -> None:
+    if PRESENT_SURFACE is not None:
+        pygame.transform.scale(screen, PRESENT_SURFACE.get_size(), PRESENT_SURFACE)
+
+
+def stamp_frame_time() -> None:
+    global frame_time
+    frame_time = now()
+
+
+def mark_problem_shown() -> None:
+    global problem_shown_time
+    if opened_menu is None and problem_shown_time is None and feedback_symbol_start_time is None:
+        if REPLAYER is not None:
+            problem_shown_time = REPLAYER.next_problem_shown_time()
+        if problem_shown_time is None:
+            problem_shown_time = now()
+        if RECORDER is not None:
+            RECORDER.record_problem_shown(frame_index, problem_shown_time)
+
+
+def next_frame() -> None:
+    global frame_index
+    frame_index += 1
+
+
+def record_event(event: pygame.event.Event, event_time: float) -> None:
+    match event.type:
+        case pygame.MOUSEMOTION:
+            RECORDER.record_event(frame_index, frame_time, event_time, recording.MOUSE_MOTION, *to_logical(event.pos))
+        case pygame.MOUSEBUTTONDOWN:
+            RECORDER.record_event(frame_index, frame_time, event_time, recording.MOUSE_BUTTON_DOWN, *to_logical(event.pos),
+                                  event.button)
+        case pygame.MOUSEBUTTONUP:
+            RECORDER.record_event(frame_index, frame_time, event_time, recording.MOUSE_BUTTON_UP, *to_logical(event.pos),
+                                  event.button)
+        case pygame.FINGERDOWN:
+            RECORDER.record_event(frame_index, frame_time, event_time, recording.FINGER_DOWN, *finger_pos(event), event.finger_id)
+        case pygame.FINGERMOTION:
+            RECORDER.record_event(frame_index, frame_time, event_time, recording.FINGER_MOTION, *finger_pos(event),
+                                  event.finger_id)
+        case pygame.FINGERUP:
+            RECORDER.record_event(frame_index, frame_time, event_time, recording.FINGER_UP, *finger_pos(event), event.finger_id)
+        case pygame.QUIT:
+            RECORDER.record_event(frame_index, frame_time, event_time, recording.QUIT)
+
+
+def print_replay_summary(render_time: float) -> None:
+    print('replayed %d frames, %d games, average render time %.3f ms' %
+          (frame_index, len(REPLAYER.results), render_time / max(1, frame_index) * 1000))
+    for ((replayed_score, n_correct, replayed_solving_time), recorded) in zip(REPLAYER.results, REPLAYER.session.results):
+        print('  %d/%d correct, score %.3f, solving time %.3f s (recorded: %d/%d, score %.3f, solving time %.3f s)' %
+              (n_correct, N_PROBLEMS, replayed_score, replayed_solving_time, recorded.n_correct, N_PROBLEMS, recorded.score,
+               recorded.solving_time))
+    print('results match' if REPLAYER.results_match() else 'RESULTS DIFFER')
+
+
+def prerender_next_problem() -> None:
+    if problem_index + 1 < N_PROBLEMS:
+        problem_displays[problem_index + 1].prerender()
+
+
 def open_menu(menu: Menu | None) -> None:
     global opened_menu
+    if opened_menu is not None:
+        opened_menu.cancel_touches()  # Finger, die noch auf dem alten Menü liegen, lösen dort nichts mehr aus
     opened_menu = menu
     if opened_menu is not None:
         opened_menu.check_buttons_hovered()
@@ -474,14 +904,22 @@ def open_leaderboard_menu() -> None:
 
 def open_result_menu() -> None:
     global solving_time, score, place, is_place_on_leaderboard, timestamp, input_initials
-    timestamp = int(time.time())
-    solving_time = game_ticks / FPS
+    timestamp = REPLAYER.next_result_timestamp() if REPLAYER is not None else None
+    if timestamp is None:
+        timestamp = int(time.time())
+    solving_time = sum(reaction_times)  # genauer als game_time, weil vom Eintreffen der Events statt von den Bildern abhängig
     n_incorrect = N_PROBLEMS - n_correct
     score = solving_time + n_incorrect * 5
     place = get_ranking()
     is_place_on_leaderboard = place != -1
     input_initials = ''
     RESULT_MENU.buttons_y_offset = 400 if is_place_on_leaderboard else 120
+    if RECORDER is not None:
+        RECORDER.record_result(frame_index, now(), score, n_correct, solving_time, timestamp)
+    if REPLAYER is not None:
+        REPLAYER.results.append((score, n_correct, solving_time))
+    if ANALYTICS is not None:
+        ANALYTICS.flush()  # geschrieben wird im Hintergrund
     open_menu(RESULT_MENU)
 
 
@@ -493,10 +931,22 @@ def set_language(lang: str) -> None:
     # KEYBOARD.set_language(language)
 
 
-def log_in_answer(answer: int) -> None:
-    global n_correct, is_correct_answer, feedback_symbol_showing_ticks
+def choose_language(lang: str) -> None:
+    set_language(lang)
+    save_data()
+
+
+def log_in_answer(answer: int, event_time: float) -> None:
+    global n_correct, is_correct_answer, feedback_symbol_start_time, next_problem_prerendered
+    if problem_shown_time is None or event_time < problem_shown_time:
+        # Das Event ist eingetroffen, bevor das Problem zu sehen war (update() hat die Anzeige davor gewechselt). Es galt
+        # also der vorigen Anzeige, deren Schaltflächen schon deaktiviert waren, und wird verworfen.
+        return
     is_correct_answer = answer == problems[problem_index].solution
     correct_answers.append(is_correct_answer)
+    reaction_times.append(event_time - problem_shown_time)
+    if ANALYTICS is not None:
+        ANALYTICS.add_answer(problems[problem_index], answer, reaction_times[-1])
     if is_correct_answer:
         n_correct += 1
         get_option_button_with_value(answer).feedback_border_color = Color.SPRING_GREEN
@@ -505,15 +955,40 @@ def log_in_answer(answer: int) -> None:
         get_option_button_with_value(problems[problem_index].solution).feedback_border_color = Color.SPRING_GREEN
     for b in problem_display.option_buttons:
         b.deactivate()
-    feedback_symbol_showing_ticks = 0
+    feedback_symbol_start_time = event_time
+    next_problem_prerendered = False
+    start_latency_measurement(event_time)
 
 
 def add_score_to_high_scores() -> None:
     global high_scores
     player_name = input_initials
-    high_scores.append(Score(score, n_correct, solving_time, timestamp, player_name))
+    operators = [p.operator for p in problems]
+    new_score = Score(score, n_correct, solving_time, timestamp, player_name, list(reaction_times), operators)
+    new_score.display_name = get_display_name(player_name)
+    high_scores.append(new_score)
     high_scores.sort(key=lambda s: s.score)
     high_scores = high_scores[:10]
+    save_data()
+    if LEADERBOARD_CLIENT is not None:
+        LEADERBOARD_CLIENT.submit(new_score.to_dict())  # wird im Hintergrund übertragen
+
+
+def apply_leaderboard_updates() -> None:
+    # übernimmt die vom Server (beim Abspielen: aus der Aufzeichnung) gekommenen Einträge in die Bestenliste
+    global high_scores
+    if LEADERBOARD_CLIENT is not None:
+        new_scores = LEADERBOARD_CLIENT.poll()
+    elif REPLAYER is not None:
+        new_scores = REPLAYER.due_leaderboard_scores()
+    else:
+        return
+    if new_scores:
+        if RECORDER is not None:
+            RECORDER.record_leaderboard_update(frame_index, frame_time, new_scores)
+        merged = leaderboard.merge_scores([h.to_dict() for h in high_scores], new_scores)
+        high_scores = [score_from_dict(h) for h in merged]
+        save_data()
 
 
 def show_progress(screen: pygame.Surface) -> None:
@@ -527,7 +1002,7 @@ def show_progress(screen: pygame.Surface) -> None:
 
 
 def show_time(screen: pygame.Surface) -> None:
-    render_text(screen, format_float(game_ticks / FPS, False), TITLE_FONT, WIDTH - 20, 24, TextAlign.RIGHT)
+    render_text(screen, format_float(game_time, False), TITLE_FONT, WIDTH - 20, 24, TextAlign.RIGHT)
 
 
 def show_result(screen: pygame.Surface) -> None:
@@ -542,8 +1017,12 @@ def show_result(screen: pygame.Surface) -> None:
 
 def show_initials_input(screen: pygame.Surface) -> None:
     cursor = len(input_initials)
+    rejected = initials_rejected_time is not None and now() - initials_rejected_time < INITIALS_REJECTED_SHOWING_TIME
     for i in range(3):
-        color = Color.WHITE if i == cursor else Color.GRAY
+        if rejected:
+            color = Color.BRIGHT_RED
+        else:
+            color = Color.WHITE if i == cursor else Color.GRAY
         pygame.draw.rect(screen, color, (WIDTH / 2 - 210 + i * 145, 470, 130, 130), width=4, border_radius=13)
     if cursor < 3:
         pygame.draw.line(screen, Color.WHITE, (WIDTH / 2 - 190 + cursor * 145, 580), (WIDTH / 2 - 100 + cursor * 145, 580), width=4)
@@ -555,15 +1034,11 @@ def show_high_scores(screen: pygame.Surface) -> None:
     # pygame.draw.rect(screen, (255, 0, 0), (WIDTH / 2 - 450, 160, 900, 700), width=1)
     for (i, h) in enumerate(high_scores):
         y = i * 50 + 200
-        if len(h.player_name) == 3 and h.player_name not in BAD_WORDS:
-            player_name = h.player_name
-        else:
-            player_name = '–'
         render_text(screen, f'{i + 1}.', TABLE_FONT, WIDTH / 2 - 402, y, TextAlign.RIGHT)
         render_text(screen, f'{h.n_correct}/{N_PROBLEMS}', TABLE_FONT, WIDTH / 2 - 280, y, TextAlign.RIGHT)
         render_text(screen, format_float(h.time, True), TABLE_FONT, WIDTH / 2 - 70, y, TextAlign.RIGHT)
         render_text(screen, date_and_time(h.timestamp, language), TABLE_FONT, WIDTH / 2 - 30, y, TextAlign.LEFT)
-        render_text(screen, player_name, TABLE_FONT, WIDTH / 2 + 363, y, TextAlign.LEFT)
+        render_text(screen, h.display_name, TABLE_FONT, WIDTH / 2 + 363, y, TextAlign.LEFT)
 
 
 def show_credits(screen: pygame.Surface) -> None:
@@ -571,21 +1046,36 @@ def show_credits(screen: pygame.Surface) -> None:
     render_text(screen, '(https://github.com/julian-hoelz)', TEXT_FONT, WIDTH / 2, 250, TextAlign.CENTER)
 
 
-def type_into_initals_input(char: str) -> None:
-    global input_initials
+def type_into_initals_input(char: str, event_time: float) -> None:
+    global input_initials, initials_rejected_time
     if len(input_initials) < 3:
+        start_latency_measurement(event_time)  # der Buchstabe erscheint oder die Eingabefelder werden rot
+        if len(input_initials) == 2 and is_bad_name(input_initials + char, BAD_WORDS):
+            initials_rejected_time = now()  # den Buchstaben ablehnen und die Eingabefelder kurz rot anzeigen
+            return
         input_initials += char
 
 
-def delete_char_in_initials_input() -> None:
+def start_latency_measurement(event_time: float) -> None:
+    # wird von Aktionen aufgerufen, die eine sichtbare Änderung auslösen; gemessen wird ab dem Eintreffen des Events
+    if LATENCY_HISTOGRAM is not None:
+        LATENCY_HISTOGRAM.start(session_start_time + event_time)
+
+
+def delete_char_in_initials_input(event_time: float) -> None:
     global input_initials
-    input_initials = input_initials[:-1]
+    if input_initials:
+        start_latency_measurement(event_time)
+        input_initials = input_initials[:-1]
 
 
 def render_text(screen: pygame.Surface, text: str, font: pygame.font.Font, x: float, y: float, text_align: TextAlign) -> None:
     if text.startswith('>'):
         text = get_translation(text[1:])
-    surface = font.render(text, True, Color.WHITE)
+    blit_text(screen, font.render(text, True, Color.WHITE), x, y, text_align)
+
+
+def blit_text(screen: pygame.Surface, surface: pygame.Surface, x: float, y: float, text_align: TextAlign) -> None:
     if text_align is TextAlign.RIGHT:
         x -= surface.get_width()
     elif text_align is TextAlign.CENTER:
@@ -603,16 +1093,22 @@ def load_data() -> None:
         high_scores = []
         return
     set_language(data['language'])
-    high_scores = [Score(h['score'], h['nCorrect'], h['time'], h['timestamp'], h['playerName']) for h in data['highScores']]
+    high_scores = [score_from_dict(h) for h in data['highScores']]
 
 
 def save_data() -> None:
+    # nur einen Schnappschuss nehmen (die Scores selbst werden nie verändert); gespeichert wird im Hintergrund
+    if AUTOSAVER is not None:
+        AUTOSAVER.request((language, tuple(high_scores)))
+
+
+def serialize_data(snapshot: tuple[str, tuple[Score, ...]]) -> str:
+    (snapshot_language, snapshot_high_scores) = snapshot
     data = {
-        'language': language,
-        'highScores': [h.to_dict() for h in high_scores]
+        'language': snapshot_language,
+        'highScores': [h.to_dict() for h in snapshot_high_scores]
     }
-    with open('data.json', 'w') as file:
-        json.dump(data, file, indent=4)
+    return json.dumps(data, indent=4)
 
 
 def quit_game() -> None:
@@ -640,10 +1136,78 @@ def format_float(f: float, sec: bool) -> str:
     return result
 
 
+def get_display_name(player_name: str) -> str:
+    if len(player_name) == 3 and not is_bad_name(player_name, BAD_WORDS):
+        return player_name
+    return '–'
+
+
+def score_from_dict(d: dict) -> Score:
+    s = Score.from_dict(d)
+    s.display_name = get_display_name(s.player_name)
+    return s
+
+
+def get_screen_name() -> str:
+    if opened_menu is None:
+        return 'ProblemDisplay'
+    if opened_menu is RESULT_MENU:
+        return 'RESULT_MENU'
+    return 'menu'
+
+
 def get_opened() -> ButtonContainer:
     return problem_display if opened_menu is None else opened_menu
 
 
+def finger_pos(event: pygame.event.Event) -> tuple[float, float]:
+    if REPLAYER is not None:
+        return (event.x, event.y)  # aufgezeichnet werden schon die logischen Koordinaten
+    # Touch-Koordinaten sind auf den Bereich 0 bis 1 des Fensters normiert
+    (display_width, display_height) = DISPLAY.get_size()
+    return to_logical((event.x * display_width, event.y * display_height))
+
+
+def get_mouse_pos() -> tuple[float, float]:
+    if REPLAYER is not None:
+        return REPLAYER.mouse_pos
+    return to_logical(pygame.mouse.get_pos())
+
+
+def now() -> float:
+    # die Zeit in Sekunden seit dem Start der Sitzung (beim Abspielen die aufgezeichnete Zeit)
+    if REPLAYER is not None:
+        return REPLAYER.time
+    return time.perf_counter() - session_start_time
+
+
+def to_pygame_event(event: recording.RecordedEvent) -> pygame.event.Event:
+    match event.kind:
+        case recording.MOUSE_MOTION:
+            return pygame.event.Event(pygame.MOUSEMOTION, pos=(event.x, event.y), touch=False)
+        case recording.MOUSE_BUTTON_DOWN:
+            return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(event.x, event.y), button=event.id, touch=False)
+        case recording.MOUSE_BUTTON_UP:
+            return pygame.event.Event(pygame.MOUSEBUTTONUP, pos=(event.x, event.y), button=event.id, touch=False)
+        case recording.FINGER_DOWN:
+            return pygame.event.Event(pygame.FINGERDOWN, x=event.x, y=event.y, finger_id=event.id)
+        case recording.FINGER_MOTION:
+            return pygame.event.Event(pygame.FINGERMOTION, x=event.x, y=event.y, finger_id=event.id)
+        case recording.FINGER_UP:
+            return pygame.event.Event(pygame.FINGERUP, x=event.x, y=event.y, finger_id=event.id)
+        case _:
+            return pygame.event.Event(pygame.QUIT)
+
+
+def to_logical(pos: tuple[float, float]) -> tuple[float, float]:
+    # rechnet eine Position im Fenster in eine Position auf der logischen Oberfläche um
+    if PRESENT_RECT is None:
+        return pos
+    (x, y) = pos
+    (present_x, present_y, present_width, present_height) = PRESENT_RECT
+    return ((x - present_x) * WIDTH / present_width, (y - present_y) * HEIGHT / present_height)
+
+
 def get_option_button_with_value(value: int) -> OptionButton:
     for b in problem_display.option_buttons:
         if b.option == value:
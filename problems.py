@@ -9,6 +9,9 @@ class Problem:
     term: str
     solution: int
     options: tuple[int, int, int]
+    operator: str
+    operands: tuple[int, int]
+    option_pattern: int  # wie die anderen Optionen zur Lösung liegen (siehe __random_options())
 
 
 MINUS = '\u2212'
@@ -38,40 +41,41 @@ def __random_problem(op) -> Problem:
         DIVIDE: __random_division_problem,
     }
     func = op_to_func[op]
-    (term, solution) = func()
-    options = __random_options(solution)
-    return Problem(term, solution, options)
+    (operand_1, operand_2, solution) = func()
+    (options, option_pattern) = __random_options(solution)
+    return Problem(f'{operand_1} {op} {operand_2}', solution, options, op, (operand_1, operand_2), option_pattern)
 
 
-def __random_addition_problem() -> tuple[str, int]:
+def __random_addition_problem() -> tuple[int, int, int]:
     summand_1 = random.randint(0, 50)
     summand_2 = random.randint(0, 50)
     solution = summand_1 + summand_2
-    return (f'{summand_1} + {summand_2}', solution)
+    return (summand_1, summand_2, solution)
 
 
-def __random_subtraction_problem() -> tuple[str, int]:
+def __random_subtraction_problem() -> tuple[int, int, int]:
     minuend = random.randint(0, 50)
     subtrahend = random.randint(0, minuend)
     solution = minuend - subtrahend
-    return (f'{minuend} {MINUS} {subtrahend}', solution)
+    return (minuend, subtrahend, solution)
 
 
-def __random_multiplication_problem() -> tuple[str, int]:
+def __random_multiplication_problem() -> tuple[int, int, int]:
     factor_1 = random.randint(0, 10)
     factor_2 = random.randint(0, 10)
     solution = factor_1 * factor_2
-    return (f'{factor_1} {MULTIPLY} {factor_2}', solution)
+    return (factor_1, factor_2, solution)
 
 
-def __random_division_problem() -> tuple[str, int]:
+def __random_division_problem() -> tuple[int, int, int]:
     divisor = random.randint(1, 10)
     solution = random.randint(0, 10)
     dividend = divisor * solution
-    return (f'{dividend} {DIVIDE} {divisor}', solution)
+    return (dividend, divisor, solution)
 
 
-def __random_options(solution: int) -> tuple[int, int, int]:
+def __random_options(solution: int) -> tuple[tuple[int, int, int], int]:
+    # gibt die Optionen und das Muster zurück (0: Lösung ist 0, sonst siehe unten)
     if solution == 0:
         option_2 = random.randint(1, 3)
         choices_for_option_3 = [1, 2, 3]
@@ -79,7 +83,7 @@ def __random_options(solution: int) -> tuple[int, int, int]:
         option_3 = random.choice(choices_for_option_3)
         options = [0, option_2, option_3]
         options.sort()
-        return tuple(options)
+        return (tuple(options), 0)
     if solution == 1:
         option_pattern = random.choice((2, 3, 3))
     else:
@@ -90,18 +94,18 @@ def __random_options(solution: int) -> tuple[int, int, int]:
             d = int(solution * x)
             additional_options = random.sample(range(d, solution), 2)
             additional_options.sort()
-            return (*additional_options, solution)
+            return ((*additional_options, solution), option_pattern)
         case 2: # eine Option kleiner, eine Option größer als die Lösung
             x = min(solution * 0.2, 0.70)
             d = int(solution * x)
             p = 2 * solution - d
             option_1 = random.randint(d, solution - 1)
             option_3 = random.randint(solution + 1, p)
-            return (option_1, solution, option_3)
+            return ((option_1, solution, option_3), option_pattern)
         case 3: # zwei Optionen größer als die Lösung
             x = min(solution * 0.2, 0.7)
             d = int(solution * x)
             p = 2 * solution - d + 1
             additional_options = random.sample(range(solution + 1, p + 1), 2)
             additional_options.sort()
-            return (solution, *additional_options)
\ No newline at end of file
+            return ((solution, *additional_options), option_pattern)
\ No newline at end of file
@@ -0,0 +1,258 @@
+import json
+import math
+import queue
+import struct
+import threading
+
+from dataclasses import dataclass
+from typing import Iterator
+
+
+# Aufbau einer Aufzeichnungsdatei: die Kennung MAGIC, danach Datensätze, die jeweils mit einem Typ-Byte beginnen.
+# Alle Zeiten sind Sekunden seit dem Start der Sitzung, alle Bildnummern zählen ab dem ersten Bild der Sitzung.
+MAGIC = b'MGR\x02'
+
+INIT_RECORD = b'I'  # Breite, Höhe, Länge der JSON-Daten, JSON-Daten (Sprache und Highscores beim Start)
+SEED_RECORD = b'S'  # Bild, Zeit, Startwert des Zufallsgenerators für einen Durchlauf
+EVENT_RECORD = b'E'  # Bild, Zeit des Bildes, Zeit des Eintreffens, Art, logisches x, logisches y, Taste oder Finger
+RESULT_RECORD = b'R'  # Bild, Zeit, Punktzahl, Anzahl richtiger Antworten, Lösungszeit, Unix-Zeit des Ergebnisses
+PROBLEM_SHOWN_RECORD = b'P'  # Bild, Zeit, zu der ein Problem zum ersten Mal angezeigt wurde (Start der Reaktionszeit)
+LEADERBOARD_RECORD = b'L'  # Bild, Zeit, Länge der JSON-Daten, JSON-Daten (vom Server erhaltene Einträge der Bestenliste)
+
+INIT_STRUCT = struct.Struct('<HHI')
+SEED_STRUCT = struct.Struct('<IdQ')
+EVENT_STRUCT = struct.Struct('<IddBffq')
+RESULT_STRUCT = struct.Struct('<IddBdq')
+PROBLEM_SHOWN_STRUCT = struct.Struct('<Id')
+LEADERBOARD_STRUCT = struct.Struct('<IdI')
+
+# die Arten der aufgezeichneten Events:
+MOUSE_MOTION = 0
+MOUSE_BUTTON_DOWN = 1
+MOUSE_BUTTON_UP = 2
+FINGER_DOWN = 3
+FINGER_MOTION = 4
+FINGER_UP = 5
+QUIT = 6
+
+
+@dataclass
+class RecordedEvent:
+
+    frame: int
+    time: float  # wann das Event behandelt wurde (der Beginn seines Bildes)
+    event_time: float  # wann das Event eingetroffen ist
+    kind: int
+    x: float
+    y: float
+    id: int
+
+
+@dataclass
+class RecordedResult:
+
+    frame: int
+    time: float
+    score: float
+    n_correct: int
+    solving_time: float
+    timestamp: int
+
+
+# Schreibt eine Sitzung in eine Datei. Die Datensätze werden im Spielloop nur verpackt, geschrieben wird in einem
+# eigenen Thread, damit der Spielloop nie auf die Festplatte warten muss.
+class SessionRecorder:
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.queue: queue.SimpleQueue[bytes | None] = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.write_loop, name='session-recorder', daemon=True)
+        self.queue.put(MAGIC)
+        self.thread.start()
+
+
+    def record_init(self, width: int, height: int, data: dict) -> None:
+        json_data = json.dumps(data, separators=(',', ':')).encode('UTF-8')
+        self.queue.put(INIT_RECORD + INIT_STRUCT.pack(width, height, len(json_data)) + json_data)
+
+
+    def record_seed(self, frame: int, time: float, seed: int) -> None:
+        self.queue.put(SEED_RECORD + SEED_STRUCT.pack(frame, time, seed))
+
+
+    def record_event(self, frame: int, time: float, event_time: float, kind: int, x: float = 0, y: float = 0,
+                     id: int = 0) -> None:
+        self.queue.put(EVENT_RECORD + EVENT_STRUCT.pack(frame, time, event_time, kind, x, y, id))
+
+
+    def record_result(self, frame: int, time: float, score: float, n_correct: int, solving_time: float,
+                      timestamp: int) -> None:
+        self.queue.put(RESULT_RECORD + RESULT_STRUCT.pack(frame, time, score, n_correct, solving_time, timestamp))
+
+
+    def record_problem_shown(self, frame: int, time: float) -> None:
+        self.queue.put(PROBLEM_SHOWN_RECORD + PROBLEM_SHOWN_STRUCT.pack(frame, time))
+
+
+    def record_leaderboard_update(self, frame: int, time: float, scores: list[dict]) -> None:
+        json_data = json.dumps(scores, separators=(',', ':')).encode('UTF-8')
+        self.queue.put(LEADERBOARD_RECORD + LEADERBOARD_STRUCT.pack(frame, time, len(json_data)) + json_data)
+
+
+    def close(self) -> None:
+        self.queue.put(None)
+        self.thread.join()
+
+
+    def write_loop(self) -> None:
+        with open(self.path, 'ab') as file:
+            while True:
+                chunk = self.queue.get()
+                # alles, was inzwischen angefallen ist, auf einmal schreiben:
+                chunks = []
+                while chunk is not None:
+                    chunks.append(chunk)
+                    try:
+                        chunk = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                file.write(b''.join(chunks))
+                file.flush()
+                if chunk is None:
+                    return
+
+
+# Die aus einer Aufzeichnungsdatei gelesene Sitzung
+class Session:
+
+    def __init__(self, path: str) -> None:
+        self.width = 0
+        self.height = 0
+        self.data: dict = {}
+        self.seeds: list[int] = []
+        self.problem_shown_times: list[float] = []
+        self.leaderboard_updates: list[tuple[float, list[dict]]] = []  # (Zeit, Einträge)
+        self.events: list[RecordedEvent] = []
+        self.results: list[RecordedResult] = []
+        for record in read_records(path):
+            match record:
+                case (b'I', width, height, data):
+                    (self.width, self.height, self.data) = (width, height, data)
+                case (b'S', _, _, seed):
+                    self.seeds.append(seed)
+                case (b'P', _, time):
+                    self.problem_shown_times.append(time)
+                case (b'L', _, time, scores):
+                    self.leaderboard_updates.append((time, scores))
+                case RecordedEvent():
+                    self.events.append(record)
+                case RecordedResult():
+                    self.results.append(record)
+
+
+def read_records(path: str) -> Iterator[tuple | RecordedEvent | RecordedResult]:
+    with open(path, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not a session recording')
+        while record_type := file.read(1):
+            match record_type:
+                case b'I':
+                    (width, height, length) = INIT_STRUCT.unpack(file.read(INIT_STRUCT.size))
+                    yield (INIT_RECORD, width, height, json.loads(file.read(length).decode('UTF-8')))
+                case b'S':
+                    yield (SEED_RECORD, *SEED_STRUCT.unpack(file.read(SEED_STRUCT.size)))
+                case b'E':
+                    yield RecordedEvent(*EVENT_STRUCT.unpack(file.read(EVENT_STRUCT.size)))
+                case b'R':
+                    yield RecordedResult(*RESULT_STRUCT.unpack(file.read(RESULT_STRUCT.size)))
+                case b'P':
+                    yield (PROBLEM_SHOWN_RECORD, *PROBLEM_SHOWN_STRUCT.unpack(file.read(PROBLEM_SHOWN_STRUCT.size)))
+                case b'L':
+                    (frame, time, length) = LEADERBOARD_STRUCT.unpack(file.read(LEADERBOARD_STRUCT.size))
+                    yield (LEADERBOARD_RECORD, frame, time, json.loads(file.read(length).decode('UTF-8')))
+                case _:
+                    raise ValueError(f'unknown record type {record_type!r} in {path}')
+
+
+# Spielt eine aufgezeichnete Sitzung ab. Die Events werden zu der Zeit geliefert, zu der sie behandelt wurden, nicht nach
+# ihrem Bild, damit das Abspielen mit jeder Bildfrequenz dasselbe Ergebnis liefert; ihre Zeitstempel bleiben erhalten.
+class Replayer:
+
+    TIME_TOLERANCE = 0.001  # so weit dürfen Punktzahlen und Lösungszeiten abweichen (in Sekunden)
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        self.time = 0.0  # die Zeit der abgespielten Sitzung
+        self.event_index = 0
+        self.seed_index = 0
+        self.problem_shown_index = 0
+        self.leaderboard_update_index = 0
+        self.last_event_time = 0.0
+        self.mouse_pos: tuple[float, float] = (0, 0)
+        self.results: list[tuple[float, int, float]] = []  # die beim Abspielen erreichten Ergebnisse
+
+
+    def finished(self) -> bool:
+        return self.event_index == len(self.session.events)
+
+
+    def advance(self, dt: float) -> None:
+        # die Zeit läuft höchstens bis zum nächsten Event (oder zur nächsten Änderung der Bestenliste) weiter, damit jedes
+        # Bild genau zur Zeit seiner Events läuft
+        self.time += dt
+        if not self.finished():
+            self.time = min(self.time, self.session.events[self.event_index].time)
+        if self.leaderboard_update_index < len(self.session.leaderboard_updates):
+            self.time = min(self.time, self.session.leaderboard_updates[self.leaderboard_update_index][0])
+
+
+    def due_events(self) -> list[RecordedEvent]:
+        events = []
+        while not self.finished() and self.session.events[self.event_index].time <= self.time:
+            event = self.session.events[self.event_index]
+            events.append(event)
+            self.event_index += 1
+            self.last_event_time = event.time
+            if event.kind in (MOUSE_MOTION, MOUSE_BUTTON_DOWN, MOUSE_BUTTON_UP):
+                self.mouse_pos = (event.x, event.y)
+        return events
+
+
+    def due_leaderboard_scores(self) -> list[dict]:
+        # gibt die Einträge zurück, die in der aufgezeichneten Sitzung bis jetzt vom Server gekommen sind
+        scores = []
+        updates = self.session.leaderboard_updates
+        while self.leaderboard_update_index < len(updates) and updates[self.leaderboard_update_index][0] <= self.time:
+            scores += updates[self.leaderboard_update_index][1]
+            self.leaderboard_update_index += 1
+        return scores
+
+
+    def next_seed(self) -> int:
+        seed = self.session.seeds[self.seed_index]
+        self.seed_index += 1
+        return seed
+
+
+    def next_problem_shown_time(self) -> float | None:
+        # die Reaktionszeiten laufen beim Abspielen ab den aufgezeichneten Zeiten, zu denen die Probleme angezeigt wurden
+        if self.problem_shown_index == len(self.session.problem_shown_times):
+            return None
+        time = self.session.problem_shown_times[self.problem_shown_index]
+        self.problem_shown_index += 1
+        return time
+
+
+    def next_result_timestamp(self) -> int | None:
+        # der Zeitstempel identifiziert eine Punktzahl in der Bestenliste, deshalb wird der aufgezeichnete verwendet
+        if len(self.results) == len(self.session.results):
+            return None
+        return self.session.results[len(self.results)].timestamp
+
+
+    def results_match(self) -> bool:
+        if len(self.results) != len(self.session.results):
+            return False
+        return all(n_correct == r.n_correct and math.isclose(score, r.score, abs_tol=Replayer.TIME_TOLERANCE) and
+                   math.isclose(solving_time, r.solving_time, abs_tol=Replayer.TIME_TOLERANCE)
+                   for ((score, n_correct, solving_time), r) in zip(self.results, self.session.results))